@@ -1,10 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from cachetools import TTLCache
 import os
 
 from database import get_db
@@ -17,6 +17,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 security = HTTPBearer()
 
+# Short-lived cache of authenticated users, keyed by user ID. The JWT is signed,
+# so a cached lookup is as trustworthy as a fresh one; entries are detached from
+# their session and must be treated as read-only snapshots.
+USER_CACHE_TTL_SECONDS = 5
+_user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -31,9 +37,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -92,9 +98,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    result = await db.execute(select(UserDB).filter(UserDB.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    # Serve repeat requests from the cache
+    user = _user_cache.get(int(user_id))
+    if user is not None:
+        return user
+
+    # Get user from database (primary key lookup)
+    user = await db.get(UserDB, int(user_id))
 
     if user is None:
         raise HTTPException(
@@ -103,9 +113,28 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Detach so the cached object can be shared across requests, then end the
+    # read transaction so the pooled connection isn't held for the rest of the
+    # request (e.g. across the Liara AI call in /tasks/process)
+    db.expunge(user)
+    await db.rollback()
+    _user_cache[user.id] = user
+
     return user
 
 
+def invalidate_cached_user(user_id: int):
+    """
+    Drop a user from the authentication cache
+
+    Call this after changing a user's row so the next request reloads it.
+
+    Args:
+        user_id: ID of the user whose row changed
+    """
+    _user_cache.pop(user_id, None)
+
+
 async def get_current_user_id(
     current_user: UserDB = Depends(get_current_user)
 ) -> int:
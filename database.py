@@ -1,17 +1,69 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event
 from sqlalchemy.orm import declarative_base
 import os
 
 # Database URL - using SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./tasks.db")
 
+# Connection pool settings (the SQLAlchemy defaults of 5 + 10 overflow run out
+# quickly under concurrent load)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds before a connection is replaced
+
+# SQLite page cache per connection, in KiB. The cache is per connection, so a
+# full pool (DB_POOL_SIZE + DB_MAX_OVERFLOW = 60 by default) can hold up to
+# 60 x 4 MB = 240 MB per worker; the memory-mapped file pages are shared
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "4096"))
+
+# Driver-specific engine arguments
+poolclass = None
+connect_args = {}
+if DATABASE_URL.startswith("sqlite"):
+    # aiosqlite defaults to NullPool, which opens a new connection (and thread)
+    # for every session
+    poolclass = AsyncAdaptedQueuePool
+elif DATABASE_URL.startswith("postgresql+asyncpg"):
+    connect_args = {
+        "server_settings": {"jit": "off"},
+        "timeout": 10,
+        "command_timeout": 60
+    }
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     echo=True,  # Set to False in production
-    future=True
+    future=True,
+    poolclass=poolclass,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args=connect_args
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Tune each new SQLite connection: WAL journal with NORMAL sync (fsync per
+        checkpoint, not per commit), memory-mapped reads, a larger page cache and
+        in-memory temp tables
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
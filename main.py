@@ -1,22 +1,51 @@
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Depends, Query, BackgroundTasks
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, exists, lambda_stmt, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime
-from openai import OpenAI
-from enum import Enum
+from openai import AsyncOpenAI
+import asyncio
+import anyio.to_thread
+import logging
+import logging.handlers
 import os
-import json
+import queue
+import re
+import orjson
+import msgspec
+from functools import partial
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+# Load environment variables (before the local imports, which read them at import time)
+load_dotenv()
+
 from database import engine, get_db
-from models import Base, UserDB, TaskDB
-from auth import create_access_token, get_current_user
-from otp_service import OTPService
+from models import Base, UserDB, TaskDB, Priority, utcnow
+from auth import create_access_token, get_current_user, invalidate_cached_user
+from otp_service import OTPService, sms_client
+
+# Application logging: records go through a queue and are written by a
+# QueueListener thread, so stream I/O never blocks the event loop
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    handlers=[logging.handlers.QueueHandler(log_queue)]
+)
+# With echo on, the engine writes SQL through its own handler on this logger;
+# keep it from also reaching the root handler (other sqlalchemy loggers still do)
+if engine.echo:
+    logging.getLogger("sqlalchemy.engine.Engine").propagate = False
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# INSERT construct supporting ON CONFLICT for the configured database
+upsert_insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
 
 
 # Helper function to increment user's data version for mobile sync
@@ -25,17 +54,47 @@ async def increment_user_version(user: UserDB, db: AsyncSession):
     Increment the user's data version for mobile app synchronization.
     Call this whenever tasks are created, updated, or deleted.
     """
-    user.data_version += 1
+    # Increment in SQL: the user object may be a cached, detached snapshot
+    await db.execute(
+        update(UserDB)
+        .where(UserDB.id == user.id)
+        .values(data_version=UserDB.data_version + 1)
+    )
     await db.commit()
+    invalidate_cached_user(user.id)
+
+
+# Shared INSERT for the task-creation endpoints (compiled once and reused)
+_TASK_INSERT = insert(TaskDB)
+
 
+async def insert_task(db: AsyncSession, user: UserDB, values: dict, with_ai_flag: bool) -> TaskDB:
+    """
+    Insert a task for the user and bump their data version in one transaction.
+    RETURNING fills in the id and timestamps, so no refresh SELECT is needed.
+    """
+    result = await db.execute(
+        _TASK_INSERT
+        .values(user_id=user.id, with_ai_flag=with_ai_flag, **values)
+        .returning(TaskDB)
+    )
+    task = result.scalar_one()
 
-# Priority enum
-class Priority(str, Enum):
-    """Task priority levels"""
-    URGENT = "Urgent"
-    HIGH = "High"
-    MEDIUM = "Medium"
-    LOW = "Low"
+    # Increment user's data version for mobile sync (commits the insert too)
+    await increment_user_version(user, db)
+
+    return task
+
+
+# Background task for /auth/send-otp
+async def deliver_otp(phone: str, otp: str):
+    """
+    Send an OTP via SMS after the send-otp response has been returned.
+    The request has already succeeded, so failures can only be logged.
+    """
+    otp_sent = await OTPService.send_otp(phone, otp)
+    if not otp_sent:
+        logger.warning("Failed to send OTP to %s", phone)
 
 
 # Configure Liara AI (OpenAI compatible)
@@ -43,31 +102,339 @@ LIARA_API_KEY = os.getenv("LIARA_API_KEY")
 LIARA_BASE_URL = os.getenv("LIARA_BASE_URL")
 LIARA_MODEL = os.getenv("LIARA_MODEL", "gpt-4o-mini")
 
-# Initialize OpenAI client with Liara AI
+# Debug mode: attach OpenAPI examples to the request/response models
+DEBUG = os.getenv("DEBUG") == "1"
+
+
+def schema_example(example: dict) -> dict | None:
+    """Model json_schema_extra with an OpenAPI example (debug mode only)"""
+    return {"example": example} if DEBUG else None
+
+
+# Include the OTP code in /auth/send-otp responses (testing only - disable in production)
+OTP_IN_RESPONSE = os.getenv("OTP_IN_RESPONSE", "true").lower() == "true"
+
+# Initialize async OpenAI client with Liara AI so LLM calls don't block the event loop
 liara_client = None
 if LIARA_API_KEY and LIARA_BASE_URL:
-    liara_client = OpenAI(
+    liara_client = AsyncOpenAI(
         api_key=LIARA_API_KEY,
         base_url=LIARA_BASE_URL
     )
 
 
+# System prompts for /tasks/process. They are built once and sent as the
+# identical leading message on every call, so providers that cache prompt
+# prefixes can reuse them instead of reprocessing the tokens each time.
+SYSTEM_PROMPT_PROCESS = """You are a Persian/Farsi task processing assistant. You will receive a task description in Persian that may contain typos, missing words, or grammatical errors.
+
+Your job is to:
+1. First, identify and correct all Persian typos and spelling mistakes
+2. Fix any missing words or grammatical errors in Persian
+3. Keep the text ONLY in Persian - DO NOT translate to any other language
+4. Generate a short, descriptive title in Persian (3-7 words)
+5. Make the text clear and professional in Persian
+6. Return ONLY a valid JSON object with Persian text
+
+IMPORTANT RULES:
+- Always return Persian text in both title and preprocessed_text
+- Never translate Persian to English or any other language
+- Fix Persian typos before processing (e.g., "تسم" → "تماس", "زمگ" → "زنگ")
+- Keep the original meaning and intent in Persian
+
+Examples:
+Input: "تسم زمگ به یکی"
+Output: {"title": "تماس تلفنی", "preprocessed_text": "تماس زنگ زدن به یکی"}
+
+Input: "نیاز بع نوشتن مستندت"
+Output: {"title": "نوشتن مستندات", "preprocessed_text": "نیاز به نوشتن مستندات"}
+
+Return your response in this exact JSON format (no markdown, no code blocks, just pure JSON):
+{
+  "title": "عنوان فارسی اینجا",
+  "preprocessed_text": "متن اصلاح شده فارسی اینجا"
+}"""
+_SYSTEM_MESSAGE_PROCESS = {"role": "system", "content": SYSTEM_PROMPT_PROCESS}
+
+
+# AI micro-batching: /tasks/process requests arriving within a short window
+# are sent to Liara as one chat completion, so the system prompt and the
+# network round-trip are paid once per batch instead of once per task
+AI_BATCH_MAX = int(os.getenv("AI_BATCH_MAX", "16"))
+AI_BATCH_WINDOW_MS = int(os.getenv("AI_BATCH_WINDOW_MS", "50"))
+
+SYSTEM_PROMPT_PROCESS_BATCH = """You are a Persian/Farsi task processing assistant. You will receive a JSON array of task descriptions in Persian that may contain typos, missing words, or grammatical errors.
+
+For EACH task in the array:
+1. Identify and correct all Persian typos and spelling mistakes
+2. Fix any missing words or grammatical errors in Persian
+3. Keep the text ONLY in Persian - DO NOT translate to any other language
+4. Generate a short, descriptive title in Persian (3-7 words)
+5. Make the text clear and professional in Persian
+
+IMPORTANT RULES:
+- Always return Persian text in both title and preprocessed_text
+- Never translate Persian to English or any other language
+- Keep the original meaning and intent in Persian
+- Return exactly one result per input task, in the same order as the input array
+
+Example:
+Input: ["تسم زمگ به یکی", "نیاز بع نوشتن مستندت"]
+Output: {"results": [{"title": "تماس تلفنی", "preprocessed_text": "تماس زنگ زدن به یکی"}, {"title": "نوشتن مستندات", "preprocessed_text": "نیاز به نوشتن مستندات"}]}
+
+Return your response in this exact JSON format (no markdown, no code blocks, just pure JSON):
+{"results": [{"title": "...", "preprocessed_text": "..."}]}"""
+_SYSTEM_MESSAGE_PROCESS_BATCH = {"role": "system", "content": SYSTEM_PROMPT_PROCESS_BATCH}
+
+# Shape of the AI responses, decoded and validated in one pass by msgspec
+class AITaskResult(msgspec.Struct):
+    """Title and corrected text generated for one task"""
+    title: str
+    preprocessed_text: str
+
+
+class AIBatchResult(msgspec.Struct):
+    """Results for a batch of tasks, in input order"""
+    results: list[AITaskResult]
+
+
+# Markdown code fences the model sometimes wraps its JSON in
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+# Pending (task_text, future) pairs waiting to be batched. Created in lifespan,
+# so the queue belongs to the event loop that serves requests
+ai_batch_queue: asyncio.Queue | None = None
+# The running ai_batch_worker task
+_ai_batch_worker: asyncio.Task | None = None
+# In-flight batch tasks (kept referenced so they aren't garbage collected)
+_ai_batch_tasks: set[asyncio.Task] = set()
+
+
+async def _process_task_text(task_text: str) -> AITaskResult:
+    """
+    Process a single task text with Liara AI.
+
+    Used for lone requests and as the fallback when a batched response
+    can't be matched back to its inputs.
+    """
+    # Call Liara AI
+    response = await liara_client.chat.completions.create(
+        model=LIARA_MODEL,
+        messages=[
+            _SYSTEM_MESSAGE_PROCESS,
+            {"role": "user", "content": f"Task text to process: {task_text}"}
+        ],
+        temperature=0,
+        response_format={"type": "json_object"}
+    )
+
+    # Get response text, removing markdown code blocks if present
+    response_text = _CODE_FENCE_RE.sub("", response.choices[0].message.content).strip()
+
+    # Parse and validate JSON response in one pass
+    try:
+        return msgspec.json.decode(response_text, type=AITaskResult)
+    except msgspec.ValidationError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"AI response missing required fields (title or preprocessed_text): {e}"
+        )
+    except msgspec.DecodeError:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to parse AI response as JSON. Response: {response_text}"
+        )
+
+
+async def _process_task_batch(task_texts: list[str]) -> list[AITaskResult] | None:
+    """
+    Process several task texts with a single Liara AI call.
+
+    Returns None if the response can't be matched one-to-one with the inputs.
+    """
+    response = await liara_client.chat.completions.create(
+        model=LIARA_MODEL,
+        messages=[
+            _SYSTEM_MESSAGE_PROCESS_BATCH,
+            {"role": "user", "content": orjson.dumps(task_texts).decode()}
+        ],
+        temperature=0,
+        response_format={"type": "json_object"}
+    )
+
+    try:
+        response_text = _CODE_FENCE_RE.sub("", response.choices[0].message.content).strip()
+        results = msgspec.json.decode(response_text, type=AIBatchResult).results
+    except msgspec.DecodeError:
+        return None
+
+    if len(results) != len(task_texts):
+        return None
+
+    return results
+
+
+async def _run_ai_batch(batch: list[tuple[str, asyncio.Future]]):
+    """Resolve every future in the batch with its AI result (or error)."""
+    task_texts = [task_text for task_text, _ in batch]
+
+    results = None
+    if len(batch) > 1:
+        try:
+            results = await _process_task_batch(task_texts)
+        except Exception as e:
+            # API errors (rate limits, timeouts, 5xx) would only repeat - and
+            # multiply the load - if retried per item, so the whole batch fails
+            results = [e] * len(batch)
+
+    # Single request, or the batch response couldn't be matched to its inputs:
+    # process items individually
+    if results is None:
+        results = await asyncio.gather(
+            *(_process_task_text(task_text) for task_text in task_texts),
+            return_exceptions=True
+        )
+
+    for (_, future), result in zip(batch, results):
+        if future.done():  # Already resolved (e.g. cancelled on shutdown)
+            continue
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+async def ai_batch_worker():
+    """
+    Background worker that groups queued task texts into batches of up to
+    AI_BATCH_MAX items, waiting at most AI_BATCH_WINDOW_MS for a batch to fill.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await ai_batch_queue.get()]
+        deadline = loop.time() + AI_BATCH_WINDOW_MS / 1000
+
+        while len(batch) < AI_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(ai_batch_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Dispatch without waiting so the next batch can start filling
+        task = asyncio.create_task(_run_ai_batch(batch))
+        _ai_batch_tasks.add(task)
+        task.add_done_callback(_ai_batch_tasks.discard)
+
+
+def _fail_queued_ai_lookups(worker: asyncio.Task):
+    """
+    Fail every lookup still waiting in the queue once the batch worker has
+    stopped, so no request waits forever on a future nobody will resolve.
+    """
+    if not worker.cancelled() and worker.exception() is not None:
+        logger.error("AI batch worker stopped", exc_info=worker.exception())
+
+    while not ai_batch_queue.empty():
+        _, future = ai_batch_queue.get_nowait()
+        if not future.done():
+            future.set_exception(HTTPException(
+                status_code=500,
+                detail="AI processing is unavailable"
+            ))
+
+
+
+# Cache of AI results keyed by (model, normalized task text). Identical texts
+# that are already being processed share the in-flight result instead of
+# triggering another Liara call.
+AI_CACHE_TTL_SECONDS = 3600
+_ai_cache = TTLCache(maxsize=5000, ttl=AI_CACHE_TTL_SECONDS)
+# (reset in lifespan along with the queue, since the futures belong to its loop)
+_ai_inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+
+def _finish_ai_lookup(key: tuple[str, str], future: asyncio.Future):
+    """Retire an in-flight lookup and cache its result if it succeeded."""
+    _ai_inflight.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        _ai_cache[key] = future.result()
+
+
+async def process_task_text_cached(task_text: str) -> AITaskResult:
+    """
+    Get the AI result for a task text from the cache, an identical in-flight
+    request, or a new batched Liara call (in that order).
+    """
+    key = (LIARA_MODEL, task_text.strip())
+    cached = _ai_cache.get(key)
+    if cached is not None:
+        return cached
+
+    future = _ai_inflight.get(key)
+    if future is None:
+        if _ai_batch_worker is None or _ai_batch_worker.done():
+            raise HTTPException(
+                status_code=500,
+                detail="AI processing is unavailable"
+            )
+
+        # Queue the text for the batch worker
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(partial(_finish_ai_lookup, key))
+        _ai_inflight[key] = future
+        await ai_batch_queue.put((task_text, future))
+
+    # Shielded so one client disconnecting doesn't cancel the shared lookup
+    return await asyncio.shield(future)
+
+
+
+# Maximum number of worker threads for sync code run by FastAPI/Starlette
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "100"))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager to handle startup and shutdown events
     """
-    # Startup: Create database tables
+    # Startup: Start writing queued log records
+    log_listener.start()
+
+    # Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     print("Database tables created successfully")
 
+    # Raise anyio's worker-thread limit (default 40) used for sync dependencies and endpoints
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+
+    # Start the AI batching worker with a queue bound to this event loop
+    global ai_batch_queue, _ai_batch_worker, _ai_inflight
+    ai_batch_queue = asyncio.Queue()
+    _ai_inflight = {}
+    _ai_batch_worker = asyncio.create_task(ai_batch_worker())
+    _ai_batch_worker.add_done_callback(_fail_queued_ai_lookups)
+
     yield
 
-    # Shutdown: Dispose of the engine
+    # Shutdown: Stop the AI batching worker and let in-flight batches finish
+    _ai_batch_worker.cancel()
+    await asyncio.gather(_ai_batch_worker, *_ai_batch_tasks, return_exceptions=True)
+
+    # Close the AI and SMS clients and dispose of the engine
+    if liara_client:
+        await liara_client.close()
+    await sms_client.aclose()
     await engine.dispose()
     print("Database connection closed")
 
+    # Flush remaining log records
+    log_listener.stop()
+
 
 app = FastAPI(
     title="Task Manager API",
@@ -100,6 +467,7 @@ app = FastAPI(
     - **Faraz SMS**: OTP delivery via SMS
     """,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     contact={
         "name": "API Support",
         "url": "https://github.com/your-repo",
@@ -132,58 +500,53 @@ app = FastAPI(
 
 class Task(BaseModel):
     """Task model with AI-processed content"""
-    title: str = Field(..., description="Task title", example="Complete project documentation")
-    description: str = Field(None, description="Task description", example="Write comprehensive API documentation")
-    proprietary: float = Field(..., description="Priority level (0-10)", example=8.5, ge=0, le=10)
-    time: int = Field(0, description="Estimated time in minutes", example=120, ge=0)
-    tags: list[str] = Field(default=[], description="Task tags", example=["documentation", "urgent"])
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "Complete project documentation",
-                "description": "Write comprehensive API documentation for the task manager",
-                "proprietary": 8.5,
-                "time": 120,
-                "tags": ["documentation", "urgent"]
-            }
-        }
+    title: str = Field(..., description="Task title")
+    description: str = Field(None, description="Task description")
+    proprietary: float = Field(..., description="Priority level (0-10)", ge=0, le=10)
+    time: int = Field(0, description="Estimated time in minutes", ge=0)
+    tags: list[str] = Field(default=[], description="Task tags")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "title": "Complete project documentation",
+            "description": "Write comprehensive API documentation for the task manager",
+            "proprietary": 8.5,
+            "time": 120,
+            "tags": ["documentation", "urgent"]
+        })
+    )
 
 
 class TaskRequest(BaseModel):
     """Request model for AI task processing"""
     task_text: str = Field(
         ...,
-        description="Raw task text in Persian (may contain typos or missing words)",
-        example="تسم زمگ به یکی"
+        description="Raw task text in Persian (may contain typos or missing words)"
     )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "task_text": "تسم زمگ به یکی"
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "task_text": "تسم زمگ به یکی"
+        })
+    )
 
 
 class TaskResponse(BaseModel):
     """Response model with AI-processed task"""
-    title: str = Field(..., description="AI-generated task title in Persian", example="تماس تلفنی")
+    title: str = Field(..., description="AI-generated task title in Persian")
     preprocessed_text: str = Field(
         ...,
-        description="Cleaned and corrected task description in Persian",
-        example="تماس زنگ زدن به یکی"
+        description="Cleaned and corrected task description in Persian"
+    )
+    original_text: str = Field(..., description="Original task text")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "title": "تماس تلفنی",
+            "preprocessed_text": "تماس زنگ زدن به یکی",
+            "original_text": "تسم زمگ به یکی"
+        })
     )
-    original_text: str = Field(..., description="Original task text", example="تسم زمگ به یکی")
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "تماس تلفنی",
-                "preprocessed_text": "تماس زنگ زدن به یکی",
-                "original_text": "تسم زمگ به یکی"
-            }
-        }
 
 
 class PhoneLoginRequest(BaseModel):
@@ -191,168 +554,222 @@ class PhoneLoginRequest(BaseModel):
     phone: str = Field(
         ...,
         description="User's phone number (international format recommended)",
-        example="09123456789",
         min_length=10,
         max_length=15
     )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "phone": "09123456789"
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "phone": "09123456789"
+        })
+    )
 
 
 class OTPVerifyRequest(BaseModel):
     """OTP verification request"""
-    phone: str = Field(..., description="User's phone number", example="09123456789")
-    otp: str = Field(..., description="6-digit OTP code", example="123456", min_length=6, max_length=6)
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "phone": "09123456789",
-                "otp": "123456"
-            }
-        }
+    phone: str = Field(..., description="User's phone number")
+    otp: str = Field(..., description="6-digit OTP code", min_length=6, max_length=6)
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "phone": "09123456789",
+            "otp": "123456"
+        })
+    )
 
 
 class OTPSendResponse(BaseModel):
     """OTP send response"""
-    message: str = Field(..., description="Success message", example="OTP sent successfully")
-    is_new_user: bool = Field(..., description="True if user was just created", example=False)
-    phone: str = Field(..., description="Phone number OTP was sent to", example="09123456789")
-    otp: str = Field(..., description="OTP code (FOR TESTING ONLY - Remove in production)", example="123456")
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "message": "OTP sent successfully",
-                "is_new_user": False,
-                "phone": "09123456789",
-                "otp": "123456"
-            }
-        }
+    message: str = Field(..., description="Success message")
+    is_new_user: bool = Field(..., description="True if user was just created")
+    phone: str = Field(..., description="Phone number OTP was sent to")
+    otp: str | None = Field(
+        None,
+        description="OTP code (FOR TESTING ONLY - omitted when OTP_IN_RESPONSE=false)"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "message": "OTP sent successfully",
+            "is_new_user": False,
+            "phone": "09123456789",
+            "otp": "123456"
+        })
+    )
 
 
 class TokenResponse(BaseModel):
     """JWT authentication token response"""
     access_token: str = Field(
         ...,
-        description="JWT access token (valid for 7 days)",
-        example="eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
+        description="JWT access token (valid for 7 days)"
+    )
+    token_type: str = Field(..., description="Token type")
+    user_id: int = Field(..., description="User ID")
+    phone: str = Field(..., description="User's phone number")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxIiwiZXhwIjoxNzM1MzI0ODAwfQ...",
+            "token_type": "bearer",
+            "user_id": 1,
+            "phone": "09123456789"
+        })
     )
-    token_type: str = Field(..., description="Token type", example="bearer")
-    user_id: int = Field(..., description="User ID", example=1)
-    phone: str = Field(..., description="User's phone number", example="09123456789")
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxIiwiZXhwIjoxNzM1MzI0ODAwfQ...",
-                "token_type": "bearer",
-                "user_id": 1,
-                "phone": "09123456789"
-            }
-        }
 
 
 class TaskCreate(BaseModel):
     """Request model for creating a task manually"""
-    title: str = Field(..., description="Task title in Persian", example="تماس تلفنی", min_length=1)
-    description: str = Field(None, description="Task description in Persian", example="تماس زنگ زدن به یکی از همکاران")
-    proprietary: Priority = Field(Priority.LOW, description="Priority level: Urgent, High, Medium, Low", example=Priority.HIGH)
-    time: int = Field(0, description="Estimated time in minutes", example=30, ge=0)
-    tags: list[str] = Field(default_factory=list, description="Task tags", example=["تماس", "فوری"])
-    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)", example="2025-12-31T23:59:59")
-    with_ai_flag: bool = Field(False, description="Whether task was processed with AI", example=False)
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "تماس تلفنی",
-                "description": "تماس زنگ زدن به یکی از همکاران",
-                "proprietary": "High",
-                "time": 30,
-                "tags": ["تماس", "فوری"],
-                "deadline": "2025-12-31T23:59:59",
-                "with_ai_flag": False
-            }
-        }
+    title: str = Field(..., description="Task title in Persian", min_length=1)
+    description: str = Field(None, description="Task description in Persian")
+    proprietary: Priority = Field(Priority.LOW, description="Priority level: Urgent, High, Medium, Low")
+    time: int = Field(0, description="Estimated time in minutes", ge=0)
+    tags: list[str] = Field(default_factory=list, description="Task tags")
+    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)")
+    with_ai_flag: bool = Field(False, description="Whether task was processed with AI")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "title": "تماس تلفنی",
+            "description": "تماس زنگ زدن به یکی از همکاران",
+            "proprietary": "High",
+            "time": 30,
+            "tags": ["تماس", "فوری"],
+            "deadline": "2025-12-31T23:59:59",
+            "with_ai_flag": False
+        })
+    )
 
 
 class TaskSubmitProcessed(BaseModel):
     """Request model for submitting an AI-processed task"""
-    title: str = Field(..., description="AI-generated task title", example="تماس تلفنی", min_length=1)
-    description: str = Field(..., description="AI-processed task description", example="تماس زنگ زدن به یکی از همکاران", min_length=1)
-    proprietary: Priority = Field(Priority.LOW, description="Priority level: Urgent, High, Medium, Low", example=Priority.HIGH)
-    time: int = Field(0, description="Estimated time in minutes", example=30, ge=0)
-    tags: list[str] = Field(default_factory=list, description="Task tags", example=["تماس", "فوری"])
-    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)", example="2025-12-31T23:59:59")
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "تماس تلفنی",
-                "description": "تماس زنگ زدن به یکی از همکاران",
-                "proprietary": "Medium",
-                "time": 15,
-                "tags": ["تماس"],
-                "deadline": "2025-12-01T18:00:00"
-            }
-        }
+    title: str = Field(..., description="AI-generated task title", min_length=1)
+    description: str = Field(..., description="AI-processed task description", min_length=1)
+    proprietary: Priority = Field(Priority.LOW, description="Priority level: Urgent, High, Medium, Low")
+    time: int = Field(0, description="Estimated time in minutes", ge=0)
+    tags: list[str] = Field(default_factory=list, description="Task tags")
+    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "title": "تماس تلفنی",
+            "description": "تماس زنگ زدن به یکی از همکاران",
+            "proprietary": "Medium",
+            "time": 15,
+            "tags": ["تماس"],
+            "deadline": "2025-12-01T18:00:00"
+        })
+    )
 
 
 class TaskUpdate(BaseModel):
     """Request model for updating a task (all fields optional)"""
-    title: str | None = Field(None, description="Task title in Persian", example="تماس تلفنی به مدیر", min_length=1)
-    description: str | None = Field(None, description="Task description in Persian", example="تماس فوری به مدیر پروژه")
-    proprietary: Priority | None = Field(None, description="Priority level: Urgent, High, Medium, Low", example=Priority.URGENT)
-    time: int | None = Field(None, description="Estimated time in minutes", example=45, ge=0)
-    tags: list[str] | None = Field(None, description="Task tags", example=["تماس", "فوری", "مدیریت"])
-    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)", example="2025-12-15T18:00:00")
-    with_ai_flag: bool | None = Field(None, description="Whether task was processed with AI", example=True)
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "تماس تلفنی به مدیر",
-                "proprietary": "Urgent",
-                "tags": ["تماس", "فوری", "مدیریت"]
-            }
-        }
+    title: str | None = Field(None, description="Task title in Persian", min_length=1)
+    description: str | None = Field(None, description="Task description in Persian")
+    proprietary: Priority | None = Field(None, description="Priority level: Urgent, High, Medium, Low")
+    time: int | None = Field(None, description="Estimated time in minutes", ge=0)
+    tags: list[str] | None = Field(None, description="Task tags")
+    deadline: datetime | None = Field(None, description="Task deadline (ISO 8601 format)")
+    with_ai_flag: bool | None = Field(None, description="Whether task was processed with AI")
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "title": "تماس تلفنی به مدیر",
+            "proprietary": "Urgent",
+            "tags": ["تماس", "فوری", "مدیریت"]
+        })
+    )
 
 
 class TaskInDB(BaseModel):
     """Response model for task stored in database"""
-    id: int = Field(..., description="Task ID", example=1)
-    title: str = Field(..., description="Task title", example="تماس تلفنی")
-    description: str | None = Field(None, description="Task description", example="تماس زنگ زدن به یکی از همکاران")
-    proprietary: Priority = Field(..., description="Priority level: Urgent, High, Medium, Low", example=Priority.HIGH)
-    time: int = Field(..., description="Estimated time in minutes", example=30)
-    tags: list[str] = Field(..., description="Task tags", example=["تماس", "فوری"])
-    deadline: datetime | None = Field(None, description="Task deadline", example="2025-12-31T23:59:59")
-    with_ai_flag: bool = Field(..., description="Whether task was processed with AI", example=False)
-    created_at: datetime = Field(..., description="When task was created", example="2025-11-28T10:00:00")
-    updated_at: datetime = Field(..., description="When task was last updated", example="2025-11-28T10:00:00")
-
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
-            "example": {
-                "id": 1,
-                "title": "تماس تلفنی",
-                "description": "تماس زنگ زدن به یکی از همکاران",
-                "proprietary": "High",
-                "time": 30,
-                "tags": ["تماس", "فوری"],
-                "deadline": "2025-12-31T23:59:59",
-                "with_ai_flag": False,
-                "created_at": "2025-11-28T10:00:00",
-                "updated_at": "2025-11-28T10:00:00"
-            }
-        }
+    id: int = Field(..., description="Task ID")
+    title: str = Field(..., description="Task title")
+    description: str | None = Field(None, description="Task description")
+    proprietary: Priority = Field(..., description="Priority level: Urgent, High, Medium, Low")
+    time: int = Field(..., description="Estimated time in minutes")
+    tags: list[str] = Field(..., description="Task tags")
+    deadline: datetime | None = Field(None, description="Task deadline")
+    with_ai_flag: bool = Field(..., description="Whether task was processed with AI")
+    created_at: datetime = Field(..., description="When task was created")
+    updated_at: datetime = Field(..., description="When task was last updated")
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra=schema_example({
+            "id": 1,
+            "title": "تماس تلفنی",
+            "description": "تماس زنگ زدن به یکی از همکاران",
+            "proprietary": "High",
+            "time": 30,
+            "tags": ["تماس", "فوری"],
+            "deadline": "2025-12-31T23:59:59",
+            "with_ai_flag": False,
+            "created_at": "2025-11-28T10:00:00",
+            "updated_at": "2025-11-28T10:00:00"
+        })
+    )
+
+
+class TaskPage(BaseModel):
+    """Response model for a page of tasks"""
+    items: list[TaskInDB] = Field(..., description="Tasks on this page (newest first)")
+    next_cursor: str | None = Field(
+        None,
+        description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "items": [
+                {
+                    "id": 1,
+                    "title": "تماس تلفنی",
+                    "description": "تماس زنگ زدن به یکی از همکاران",
+                    "proprietary": "High",
+                    "time": 30,
+                    "tags": ["تماس", "فوری"],
+                    "deadline": "2025-12-31T23:59:59",
+                    "with_ai_flag": False,
+                    "created_at": "2025-11-28T10:00:00",
+                    "updated_at": "2025-11-28T10:00:00"
+                }
+            ],
+            "next_cursor": "2025-11-28T10:00:00_1"
+        })
+    )
+
+
+# Column names serialized for TaskInDB responses
+_TASK_FIELDS = tuple(TaskInDB.model_fields)
+
+
+def task_to_dict(task: TaskDB) -> dict:
+    """Serialize a TaskDB row with the TaskInDB fields, skipping Pydantic validation"""
+    return {field: getattr(task, field) for field in _TASK_FIELDS}
+
+
+def encode_task_cursor(task: TaskDB) -> str:
+    """
+    Keyset cursor for the page after `task`: its created_at and id
+
+    The id breaks ties between tasks created in the same instant, so no task
+    is skipped when a page ends in the middle of such a group.
+    """
+    return f"{task.created_at.isoformat()}_{task.id}"
+
+
+def decode_task_cursor(cursor: str) -> tuple[datetime, int]:
+    """Parse a cursor made by encode_task_cursor into (created_at, id)"""
+    try:
+        created_at, task_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor"
+        )
+
 
 
 
@@ -401,9 +818,14 @@ async def health_check():
     tags=["Authentication"],
     summary="Send OTP to phone number",
     response_description="OTP sent successfully",
+    response_model_exclude_none=True,
     status_code=200
 )
-async def send_otp(request: PhoneLoginRequest, db: AsyncSession = Depends(get_db)):
+async def send_otp(
+    request: PhoneLoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """
     ## Send OTP for Authentication
 
@@ -416,56 +838,64 @@ async def send_otp(request: PhoneLoginRequest, db: AsyncSession = Depends(get_db
     **OTP Details:**
     - 6-digit numeric code
     - Valid for 5 minutes
-    - Sent via Faraz SMS service
+    - Sent via Faraz SMS service (in the background, after the response is returned)
     - Can be requested multiple times (replaces previous OTP)
 
     **Response:**
     - `message`: Success message
     - `is_new_user`: Boolean indicating if this is a new user registration
     - `phone`: The phone number OTP was sent to
-    - `otp`: **[TESTING MODE]** The OTP code (for easy testing - remove in production)
+    - `otp`: **[TESTING MODE]** The OTP code (only when `OTP_IN_RESPONSE` is enabled)
 
     **⚠️ IMPORTANT:** The OTP is included in the response for testing purposes only.
-    In production, remove the `otp` field from the response model.
+    In production, set `OTP_IN_RESPONSE=false` to omit it.
 
     **Public endpoint - No authentication required.**
     """
-    # Check if user exists
-    result = await db.execute(select(UserDB).filter(UserDB.phone == request.phone))
-    user = result.scalar_one_or_none()
-
-    is_new_user = False
-
-    # If user doesn't exist, create new user
-    if not user:
-        user = UserDB(phone=request.phone)
-        db.add(user)
-        is_new_user = True
-
-    # Generate OTP
+    # Generate OTP (only its digest is stored)
     otp_code = OTPService.generate_otp()
+    otp_hash = OTPService.hash_otp(otp_code)
+    now = utcnow()
 
-    # Update user with OTP
-    user.otp_code = otp_code
-    user.otp_created_at = datetime.utcnow()
-    user.otp_verified = False
+    # Create the user if the phone number is new, otherwise reset their OTP -
+    # one atomic upsert. created_at only equals `now` if the row was inserted.
+    result = await db.execute(
+        upsert_insert(UserDB)
+        .values(
+            phone=request.phone,
+            otp_code=otp_hash,
+            otp_created_at=now,
+            otp_verified=False,
+            created_at=now,
+            updated_at=now
+        )
+        .on_conflict_do_update(
+            index_elements=[UserDB.phone],
+            set_={
+                "otp_code": otp_hash,
+                "otp_created_at": now,
+                "otp_verified": False,
+                "updated_at": now
+            }
+        )
+        .returning(UserDB.id, UserDB.created_at)
+    )
+    user_id, created_at = result.one()
+    is_new_user = created_at == now
 
     await db.commit()
+    invalidate_cached_user(user_id)
 
-    # Send OTP (you will integrate SMS provider here)
-    otp_sent = await OTPService.send_otp(request.phone, otp_code)
-
-    if not otp_sent:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to send OTP. Please try again."
-        )
+    # Send OTP after the response goes out, so the client doesn't wait on the SMS provider.
+    # The commit above already returned the connection to the pool, and get_db's session
+    # is closed before background tasks run, so no connection is held during the send.
+    background_tasks.add_task(deliver_otp, request.phone, otp_code)
 
     return OTPSendResponse(
         message="OTP sent successfully" if not is_new_user else "New user created. OTP sent successfully",
         is_new_user=is_new_user,
         phone=request.phone,
-        otp=otp_code  # FOR TESTING ONLY - Remove in production
+        otp=otp_code if OTP_IN_RESPONSE else None  # FOR TESTING ONLY
     )
 
 
@@ -503,7 +933,8 @@ async def verify_otp(request: OTPVerifyRequest, db: AsyncSession = Depends(get_d
     **Public endpoint - No authentication required.**
     """
     # Get user
-    result = await db.execute(select(UserDB).filter(UserDB.phone == request.phone))
+    phone = request.phone
+    result = await db.execute(lambda_stmt(lambda: select(UserDB).filter(UserDB.phone == phone)))
     user = result.scalar_one_or_none()
 
     if not user:
@@ -527,7 +958,7 @@ async def verify_otp(request: OTPVerifyRequest, db: AsyncSession = Depends(get_d
         )
 
     # Verify OTP
-    if user.otp_code != request.otp:
+    if not OTPService.check_otp(user.otp_code, request.otp):
         raise HTTPException(
             status_code=400,
             detail="Invalid OTP. Please try again."
@@ -539,6 +970,7 @@ async def verify_otp(request: OTPVerifyRequest, db: AsyncSession = Depends(get_d
     user.otp_created_at = None
 
     await db.commit()
+    invalidate_cached_user(user.id)
 
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -577,7 +1009,7 @@ async def get_me(current_user: UserDB = Depends(get_current_user)):
 
     **Mobile Sync:**
     - Compare `data_version` with locally stored version
-    - If different, call `GET /tasks` to sync latest data
+    - If different, call `GET /tasks` (following `next_cursor` until it is null) to sync latest data
     - Update local version after successful sync
     """
     return {
@@ -647,76 +1079,11 @@ async def process_task(
         )
 
     try:
-        # Create prompt for AI to preprocess the task and generate title
-        system_prompt = """You are a Persian/Farsi task processing assistant. You will receive a task description in Persian that may contain typos, missing words, or grammatical errors.
-
-Your job is to:
-1. First, identify and correct all Persian typos and spelling mistakes
-2. Fix any missing words or grammatical errors in Persian
-3. Keep the text ONLY in Persian - DO NOT translate to any other language
-4. Generate a short, descriptive title in Persian (3-7 words)
-5. Make the text clear and professional in Persian
-6. Return ONLY a valid JSON object with Persian text
-
-IMPORTANT RULES:
-- Always return Persian text in both title and preprocessed_text
-- Never translate Persian to English or any other language
-- Fix Persian typos before processing (e.g., "تسم" → "تماس", "زمگ" → "زنگ")
-- Keep the original meaning and intent in Persian
-
-Examples:
-Input: "تسم زمگ به یکی"
-Output: {"title": "تماس تلفنی", "preprocessed_text": "تماس زنگ زدن به یکی"}
-
-Input: "نیاز بع نوشتن مستندت"
-Output: {"title": "نوشتن مستندات", "preprocessed_text": "نیاز به نوشتن مستندات"}
-
-Return your response in this exact JSON format (no markdown, no code blocks, just pure JSON):
-{
-  "title": "عنوان فارسی اینجا",
-  "preprocessed_text": "متن اصلاح شده فارسی اینجا"
-}"""
-
-        # Call Liara AI
-        response = liara_client.chat.completions.create(
-            model=LIARA_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Task text to process: {request.task_text}"}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-
-        # Get response text
-        response_text = response.choices[0].message.content.strip()
-
-        # Clean the response - remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text.replace("```json", "").replace("```", "").strip()
-        elif response_text.startswith("```"):
-            response_text = response_text.replace("```", "").strip()
-
-        # Parse JSON response
-        try:
-            parsed_response = json.loads(response_text)
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to extract from response
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to parse AI response as JSON. Response: {response_text}"
-            )
-
-        # Validate required fields
-        if "title" not in parsed_response or "preprocessed_text" not in parsed_response:
-            raise HTTPException(
-                status_code=500,
-                detail="AI response missing required fields (title or preprocessed_text)"
-            )
+        parsed_response = await process_task_text_cached(request.task_text)
 
         return TaskResponse(
-            title=parsed_response["title"],
-            preprocessed_text=parsed_response["preprocessed_text"],
+            title=parsed_response.title,
+            preprocessed_text=parsed_response.preprocessed_text,
             original_text=request.task_text
         )
 
@@ -778,26 +1145,13 @@ async def create_task(
     ```
     """
     # Create new task in database
-    new_task = TaskDB(
-        title=task.title,
-        description=task.description,
-        user_id=current_user.id,
-        proprietary=task.proprietary,
-        time=task.time,
-        tags=task.tags,
-        deadline=task.deadline,
+    return await insert_task(
+        db,
+        current_user,
+        task.model_dump(exclude={"with_ai_flag"}),
         with_ai_flag=task.with_ai_flag
     )
 
-    db.add(new_task)
-    await db.commit()
-    await db.refresh(new_task)
-
-    # Increment user's data version for mobile sync
-    await increment_user_version(current_user, db)
-
-    return new_task
-
 
 @app.post(
     "/tasks/submit-processed",
@@ -853,71 +1207,75 @@ async def submit_processed_task(
     ```
     """
     # Create new task in database with AI flag set to true
-    new_task = TaskDB(
-        title=task.title,
-        description=task.description,
-        user_id=current_user.id,
-        proprietary=task.proprietary,
-        time=task.time,
-        tags=task.tags,
-        deadline=task.deadline,
-        with_ai_flag=True  # Automatically set for AI-processed tasks
-    )
-
-    db.add(new_task)
-    await db.commit()
-    await db.refresh(new_task)
-
-    # Increment user's data version for mobile sync
-    await increment_user_version(current_user, db)
-
-    return new_task
+    return await insert_task(db, current_user, task.model_dump(), with_ai_flag=True)
 
 
 @app.get(
     "/tasks",
-    response_model=list[TaskInDB],
+    response_model=TaskPage,
     tags=["Tasks"],
-    summary="Get all tasks for current user",
-    response_description="List of all user's tasks",
+    summary="Get tasks for current user (paginated)",
+    response_description="A page of the user's tasks",
     status_code=200
 )
 async def get_tasks(
+    cursor: str | None = Query(
+        None,
+        description="`next_cursor` from the previous page; omit for the first page"
+    ),
+    limit: int = Query(50, description="Maximum number of tasks to return", ge=1, le=200),
     current_user: UserDB = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    ## Get All Tasks for Current User
+    ## Get Tasks for Current User
 
-    Retrieve all tasks created by the authenticated user.
+    Retrieve the tasks created by the authenticated user, one page at a time.
 
     **Authentication Required:**
     - Include JWT token in Authorization header
     - Format: `Authorization: Bearer {access_token}`
 
+    **Query Parameters:**
+    - `cursor`: The `next_cursor` value from the previous page, passed back unchanged (omit for the first page)
+    - `limit`: Page size (default: 50, max: 200)
+
     **Returns:**
-    - List of all tasks belonging to the authenticated user
+    - `items`: Tasks on this page, ordered by creation date (newest first, then by ID)
+    - `next_cursor`: Cursor for the next page, or `null` if this is the last page
     - Each task includes: id, title, description, priority, time, tags, deadline, AI flag, timestamps
-    - Ordered by creation date (newest first)
 
     **Response:**
-    - Empty array `[]` if user has no tasks
-    - Array of task objects if tasks exist
+    - `{"items": [], "next_cursor": null}` if user has no tasks
+
+    **Error Responses:**
+    - `400`: Invalid cursor
 
     **Use Cases:**
     - Display user's task list
     - Task management dashboard
     - Task overview and planning
     """
-    # Query all tasks for current user
-    result = await db.execute(
-        select(TaskDB)
-        .filter(TaskDB.user_id == current_user.id)
-        .order_by(TaskDB.created_at.desc())
-    )
+    # Keyset pagination on (created_at, id): served by the (user_id, created_at, id) index
+    # (built as a cached lambda statement, so it isn't reconstructed per request)
+    user_id = current_user.id
+    stmt = lambda_stmt(lambda: select(TaskDB).filter(TaskDB.user_id == user_id))
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_task_cursor(cursor)
+        stmt += lambda s: s.filter(
+            tuple_(TaskDB.created_at, TaskDB.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    stmt += lambda s: s.order_by(TaskDB.created_at.desc(), TaskDB.id.desc()).limit(limit)
+
+    result = await db.execute(stmt)
     tasks = result.scalars().all()
 
-    return tasks
+    # Rows come straight from the database, so skip re-validating them through
+    # TaskPage and let orjson encode the page directly
+    return ORJSONResponse({
+        "items": [task_to_dict(task) for task in tasks],
+        "next_cursor": encode_task_cursor(tasks[-1]) if len(tasks) == limit else None
+    })
 
 
 @app.put(
@@ -972,38 +1330,44 @@ async def update_task(
     }
     ```
     """
-    # Get the task from database
+    # Update only the fields that were provided, read straight off the
+    # validated model (no model_dump round-trip)
+    update_data = {field: getattr(task_update, field) for field in task_update.model_fields_set}
+
+    # The user_id guard folds the ownership check into the UPDATE, and
+    # RETURNING hands back the updated row, so the happy path is one statement.
+    # Runs against the table, so the row comes back as plain columns without
+    # building an ORM object
+    tasks_table = TaskDB.__table__
     result = await db.execute(
-        select(TaskDB).filter(TaskDB.id == task_id)
+        update(tasks_table)
+        .where(tasks_table.c.id == task_id, tasks_table.c.user_id == current_user.id)
+        .values(**update_data)
+        .returning(*tasks_table.c)
     )
-    task = result.scalar_one_or_none()
+    task = result.mappings().one_or_none()
 
-    # Check if task exists
-    if not task:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Task with ID {task_id} not found"
+    if task is None:
+        # Nothing updated: find out whether the task is missing or someone else's
+        result = await db.execute(
+            lambda_stmt(lambda: select(exists().where(TaskDB.id == task_id)))
         )
 
-    # Check if task belongs to current user
-    if task.user_id != current_user.id:
+        # Check if task exists
+        if not result.scalar():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Task with ID {task_id} not found"
+            )
+
+        # Task belongs to another user
         raise HTTPException(
             status_code=403,
             detail="Not authorized to update this task"
         )
 
-    # Update only the fields that were provided
-    update_data = task_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-
-    # Update the updated_at timestamp
-    task.updated_at = datetime.utcnow()
-
-    await db.commit()
-    await db.refresh(task)
-
-    # Increment user's data version for mobile sync
+    # Increment user's data version for mobile sync (commits the update too)
     await increment_user_version(current_user, db)
 
-    return task
+    # Straight from the database, so skip re-validating through TaskInDB
+    return ORJSONResponse({field: task[field] for field in _TASK_FIELDS})
@@ -0,0 +1,53 @@
+"""
+Migration script to add the composite task indexes
+Run this once to create them on an existing database (create_all only
+creates indexes together with new tables)
+"""
+import sqlite3
+import os
+
+DB_PATH = "./tasks.db"
+
+INDEXES = {
+    "ix_tasks_user_created": ("user_id", "created_at", "id"),
+    "ix_tasks_user_deadline": ("user_id", "deadline"),
+    "ix_tasks_user_priority": ("user_id", "proprietary"),
+}
+
+def migrate():
+    """Create the (user_id, ...) composite indexes on the tasks table"""
+    if not os.path.exists(DB_PATH):
+        print(f"Database {DB_PATH} not found. No migration needed.")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        for name, columns in INDEXES.items():
+            # Rebuild indexes created with an older column list
+            cursor.execute(f"PRAGMA index_info({name})")
+            existing = tuple(column[2] for column in cursor.fetchall())
+            if existing and existing != columns:
+                print(f"Dropping outdated index '{name}'...")
+                cursor.execute(f"DROP INDEX {name}")
+
+            print(f"Creating index '{name}'...")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON tasks ({', '.join(columns)})"
+            )
+
+        conn.commit()
+        print("✓ Migration completed successfully!")
+        print(f"  - Ensured {len(INDEXES)} index(es) on tasks table")
+
+    except sqlite3.Error as e:
+        print(f"✗ Migration failed: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -14,24 +14,27 @@ def migrate():
         return
 
     conn = sqlite3.connect(DB_PATH)
+    # WAL + NORMAL sync: the commit doesn't wait on a full fsync
+    conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
     cursor = conn.cursor()
 
     try:
-        # Check if column already exists
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [column[1] for column in cursor.fetchall()]
+        cursor.execute("BEGIN IMMEDIATE")
 
-        if 'data_version' in columns:
+        # Add the data_version column; SQLite has no ADD COLUMN IF NOT EXISTS,
+        # so an existing column shows up as a "duplicate column" error
+        print("Adding 'data_version' column to users table...")
+        try:
+            cursor.execute("""
+                ALTER TABLE users
+                ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0
+            """)
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e):
+                raise
             print("✓ Column 'data_version' already exists. No migration needed.")
             return
 
-        # Add the data_version column
-        print("Adding 'data_version' column to users table...")
-        cursor.execute("""
-            ALTER TABLE users
-            ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0
-        """)
-
         conn.commit()
         print("✓ Migration completed successfully!")
         print("  - Added 'data_version' column to users table")
@@ -0,0 +1,46 @@
+"""
+Migration script to clear plaintext OTP codes from the users table
+Run this once after upgrading to hashed OTP storage - pending plaintext codes
+can't be read as the new binary digest column
+"""
+import sqlite3
+import os
+
+DB_PATH = "./tasks.db"
+
+def migrate():
+    """Clear pending plaintext OTP codes (users simply request a new OTP)"""
+    if not os.path.exists(DB_PATH):
+        print(f"Database {DB_PATH} not found. No migration needed.")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        # Digests are stored as BLOBs; anything stored as text is a plaintext code
+        cursor.execute("""
+            UPDATE users
+            SET otp_code = NULL, otp_created_at = NULL
+            WHERE typeof(otp_code) = 'text'
+        """)
+        cleared_count = cursor.rowcount
+
+        conn.commit()
+
+        if cleared_count > 0:
+            print("✓ Migration completed successfully!")
+            print(f"  - Cleared {cleared_count} plaintext OTP code(s)")
+        else:
+            print("✓ No plaintext OTP codes found. No changes needed.")
+
+    except sqlite3.Error as e:
+        print(f"✗ Migration failed: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
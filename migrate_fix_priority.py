@@ -14,51 +14,41 @@ def migrate():
         return
 
     conn = sqlite3.connect(DB_PATH)
+    # WAL + NORMAL sync: the commit doesn't wait on a full fsync
+    conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
     cursor = conn.cursor()
 
     try:
-        # Get all tasks
-        cursor.execute("SELECT id, proprietary FROM tasks")
-        tasks = cursor.fetchall()
+        # Take the write lock up front: the whole conversion is one transaction
+        cursor.execute("BEGIN IMMEDIATE")
 
-        if not tasks:
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM tasks)")
+        if not cursor.fetchone()[0]:
             print("No tasks found. No migration needed.")
             return
 
-        updated_count = 0
-
-        for task_id, proprietary in tasks:
-            new_priority = None
-
-            # Convert numeric values to enum strings
-            try:
-                numeric_value = float(proprietary)
-                if numeric_value >= 8:
-                    new_priority = "Urgent"
-                elif numeric_value >= 6:
-                    new_priority = "High"
-                elif numeric_value >= 4:
-                    new_priority = "Medium"
-                else:
-                    new_priority = "Low"
-
-                cursor.execute(
-                    "UPDATE tasks SET proprietary = ? WHERE id = ?",
-                    (new_priority, task_id)
-                )
-                updated_count += 1
-                print(f"  Task {task_id}: {proprietary} → {new_priority}")
-
-            except (ValueError, TypeError):
-                # Already a string (enum value), skip
-                if proprietary not in ["Urgent", "High", "Medium", "Low"]:
-                    # Invalid value, set to default
-                    cursor.execute(
-                        "UPDATE tasks SET proprietary = ? WHERE id = ?",
-                        ("Low", task_id)
-                    )
-                    updated_count += 1
-                    print(f"  Task {task_id}: {proprietary} → Low (invalid value)")
+        # Convert every non-enum value in a single set-based UPDATE:
+        # numbers (or numeric text) map to a priority by threshold, anything
+        # else (invalid text, NULL) falls back to Low
+        cursor.execute("""
+            UPDATE tasks
+            SET proprietary = CASE
+                WHEN typeof(proprietary) IN ('integer', 'real')
+                     OR (typeof(proprietary) = 'text'
+                         AND trim(proprietary) GLOB '*[0-9]*'
+                         AND trim(proprietary) NOT GLOB '*[^0-9.eE+-]*')
+                THEN CASE
+                    WHEN CAST(proprietary AS REAL) >= 8 THEN 'Urgent'
+                    WHEN CAST(proprietary AS REAL) >= 6 THEN 'High'
+                    WHEN CAST(proprietary AS REAL) >= 4 THEN 'Medium'
+                    ELSE 'Low'
+                END
+                ELSE 'Low'
+            END
+            WHERE proprietary IS NULL
+               OR proprietary NOT IN ('Urgent', 'High', 'Medium', 'Low')
+        """)
+        updated_count = cursor.rowcount
 
         conn.commit()
 
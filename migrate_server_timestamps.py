@@ -0,0 +1,87 @@
+"""
+Migration script to give created_at/updated_at database-side defaults
+Run this once to update the existing database schema - SQLite can't change a
+column default in place, so the users and tasks tables are rebuilt from the
+current models and their rows copied over.
+Run migrate_add_version.py and migrate_fix_priority.py first.
+"""
+import sqlite3
+import os
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models import Base
+
+DB_PATH = "./tasks.db"
+
+def migrate():
+    """Rebuild users and tasks so their timestamps default to the database clock"""
+    if not os.path.exists(DB_PATH):
+        print(f"Database {DB_PATH} not found. No migration needed.")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    dialect = sqlite.dialect()
+
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        rebuilt = []
+
+        for table in (Base.metadata.tables["users"], Base.metadata.tables["tasks"]):
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table.name,)
+            )
+            row = cursor.fetchone()
+            if row is None or "DEFAULT (STRFTIME" in row[0]:
+                continue
+
+            # Only copy the columns both versions of the table have
+            cursor.execute(f"PRAGMA table_info({table.name})")
+            existing = {column[1] for column in cursor.fetchall()}
+            columns = ", ".join(c.name for c in table.columns if c.name in existing)
+
+            print(f"Rebuilding '{table.name}' table...")
+
+            # Drop the old explicit indexes so the new table can reuse their names
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table.name,)
+            )
+            for (index_name,) in cursor.fetchall():
+                cursor.execute(f"DROP INDEX {index_name}")
+
+            cursor.execute(f"ALTER TABLE {table.name} RENAME TO {table.name}_old")
+            cursor.execute(str(CreateTable(table).compile(dialect=dialect)))
+            cursor.execute(
+                f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old"
+            )
+            cursor.execute(f"DROP TABLE {table.name}_old")
+            for index in table.indexes:
+                # Skip PostgreSQL-only (GIN) indexes
+                if index.dialect_kwargs.get("postgresql_using"):
+                    continue
+                cursor.execute(str(CreateIndex(index).compile(dialect=dialect)))
+
+            rebuilt.append(table.name)
+
+        conn.commit()
+
+        if rebuilt:
+            print("✓ Migration completed successfully!")
+            print(f"  - Rebuilt table(s): {', '.join(rebuilt)}")
+        else:
+            print("✓ Timestamps already default to the database clock. No changes needed.")
+
+    except sqlite3.Error as e:
+        print(f"✗ Migration failed: {e}")
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -1,10 +1,61 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Index
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, LargeBinary, Index, Enum as SAEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from datetime import datetime, timezone
+from enum import Enum
 
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime
+
+    The DateTime columns below store naive UTC values, so timestamps written to
+    or compared against them must be naive as well.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class utc_now(FunctionElement):
+    """
+    Current UTC time evaluated by the database, as a naive timestamp
+
+    Used for server-side column defaults so rows are stamped by the database
+    instead of in Python. Values match what utcnow() would have written.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now, "postgresql")
+def _pg_utc_now(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utc_now, "sqlite")
+def _sqlite_utc_now(element, compiler, **kw):
+    # Same text layout SQLAlchemy uses for SQLite DateTime (microseconds, zero-padded),
+    # so server- and client-written values compare correctly as strings
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+@compiles(utc_now)
+def _default_utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+# Priority enum
+class Priority(str, Enum):
+    """Task priority levels"""
+    URGENT = "Urgent"
+    HIGH = "High"
+    MEDIUM = "Medium"
+    LOW = "Low"
+
+
 class UserDB(Base):
     """
     Database model for users
@@ -12,7 +63,7 @@ class UserDB(Base):
     Fields:
     - id: Primary key
     - phone: User's phone number (unique)
-    - otp_code: Current OTP code (nullable)
+    - otp_code: HMAC-SHA256 digest of the current OTP code (nullable)
     - otp_created_at: When OTP was created (nullable)
     - otp_verified: Whether OTP has been verified
     - data_version: Version number for mobile sync (increments on task changes)
@@ -23,12 +74,15 @@ class UserDB(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     phone = Column(String, unique=True, nullable=False, index=True)
-    otp_code = Column(String, nullable=True)
+    otp_code = Column(LargeBinary(32), nullable=True)
     otp_created_at = Column(DateTime, nullable=True)
     otp_verified = Column(Boolean, default=False)
     data_version = Column(Integer, default=0, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
+
+    # Fetch the database-generated timestamps back with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<User(id={self.id}, phone='{self.phone}')>"
@@ -45,13 +99,22 @@ class TaskDB(Base):
     - user_id: ID of the user who created the task
     - time: Estimated time for the task (in minutes)
     - with_ai_flag: Whether the task was processed with AI
-    - tags: List of tags (stored as JSON)
+    - tags: List of tags (stored as JSON, JSONB on PostgreSQL)
     - deadline: Task deadline
     - proprietary: Priority level (Urgent, High, Medium, Low)
     - created_at: Timestamp when task was created
     - updated_at: Timestamp when task was last updated
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Equality column (user_id) first, sort/range column second
+        # Serves the per-user, newest-first task listing (keyset on created_at, id) without a sort
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_deadline", "user_id", "deadline"),
+        Index("ix_tasks_user_priority", "user_id", "proprietary"),
+        # Tag containment (tags @> '["..."]') on PostgreSQL only; other databases skip it
+        Index("ix_tasks_tags_gin", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, nullable=False, index=True)
@@ -59,11 +122,25 @@ class TaskDB(Base):
     user_id = Column(Integer, nullable=False, index=True)
     time = Column(Integer, default=0)  # Time in minutes
     with_ai_flag = Column(Boolean, default=False)
-    tags = Column(JSON, default=list)  # Store tags as JSON array
+    tags = Column(JSON().with_variant(JSONB, "postgresql"), default=list)  # Store tags as JSON array (JSONB on PostgreSQL)
     deadline = Column(DateTime, nullable=True)
-    proprietary = Column(String, default="Low")  # Priority level: Urgent, High, Medium, Low
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    proprietary = Column(
+        # Native ENUM on PostgreSQL, VARCHAR + CHECK elsewhere; stores the values ("Low"), not the names
+        SAEnum(
+            Priority,
+            name="priority_enum",
+            native_enum=True,
+            create_constraint=True,
+            values_callable=lambda priorities: [priority.value for priority in priorities]
+        ),
+        nullable=False,
+        default=Priority.LOW
+    )  # Priority level: Urgent, High, Medium, Low
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
+
+    # Fetch the database-generated timestamps back with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', user_id='{self.user_id}')>"
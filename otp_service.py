@@ -1,9 +1,23 @@
-import random
-import string
-from datetime import datetime, timedelta
+import secrets
+import hashlib
+import hmac
+import time
+from datetime import datetime, timezone
 import os
+import logging
 import httpx
 
+logger = logging.getLogger(__name__)
+
+# Shared SMS HTTP client: keeps connections alive between sends (closed in main's lifespan)
+sms_client = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+)
+
+# Key for hashing stored OTP codes (defaults to the JWT secret)
+OTP_SECRET_KEY = os.getenv("OTP_SECRET_KEY") or os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
+
 
 class OTPService:
     """
@@ -13,7 +27,7 @@ class OTPService:
     @staticmethod
     def generate_otp(length: int = 6) -> str:
         """
-        Generate a random OTP code
+        Generate a cryptographically secure random OTP code
 
         Args:
             length: Length of OTP code (default: 6)
@@ -21,9 +35,35 @@ class OTPService:
         Returns:
             OTP code as string
         """
-        # Generate numeric OTP
-        otp = ''.join(random.choices(string.digits, k=length))
-        return otp
+        # Generate numeric OTP from a single CSPRNG draw, zero-padded to length
+        return f"{secrets.randbelow(10 ** length):0{length}d}"
+
+    @staticmethod
+    def hash_otp(otp: str) -> bytes:
+        """
+        Hash an OTP code for storage, so plaintext codes never reach the database
+
+        Args:
+            otp: OTP code
+
+        Returns:
+            32-byte HMAC-SHA256 digest of the code
+        """
+        return hmac.new(OTP_SECRET_KEY.encode(), otp.encode(), hashlib.sha256).digest()
+
+    @staticmethod
+    def check_otp(otp_hash: bytes, otp: str) -> bool:
+        """
+        Check a submitted OTP against the stored digest in constant time
+
+        Args:
+            otp_hash: Digest stored by hash_otp
+            otp: OTP code submitted by the user
+
+        Returns:
+            True if the code matches, False otherwise
+        """
+        return hmac.compare_digest(otp_hash, OTPService.hash_otp(otp))
 
     @staticmethod
     def is_otp_valid(otp_created_at: datetime, expiry_minutes: int = 5) -> bool:
@@ -40,9 +80,11 @@ class OTPService:
         if not otp_created_at:
             return False
 
-        now = datetime.utcnow()
-        expiry_time = otp_created_at + timedelta(minutes=expiry_minutes)
-        return now <= expiry_time
+        expiry_seconds = expiry_minutes * 60
+
+        # Stored timestamps are naive UTC; compare as epoch seconds
+        created_ts = otp_created_at.replace(tzinfo=timezone.utc).timestamp()
+        return time.time() - created_ts <= expiry_seconds
 
     @staticmethod
     async def send_otp(phone: str, otp: str) -> bool:
@@ -61,15 +103,9 @@ class OTPService:
         Returns:
             True if sent successfully, False otherwise
         """
-        # TESTING MODE: Skip actual SMS sending, just log to console
-        print(f"\n{'='*50}")
-        print(f"📱 OTP REQUEST - Testing Mode")
-        print(f"📱 Phone: {phone}")
-        print(f"🔐 OTP Code: {otp}")
-        print(f"📄 Pattern: کد ورود شما: {otp} code : {otp} شرکت صفر و یک")
-        print(f"⏰ Valid for 5 minutes")
-        print(f"ℹ️  OTP is included in API response for testing")
-        print(f"{'='*50}\n")
+        # TESTING MODE: Skip actual SMS sending, just log the code (valid for 5 minutes;
+        # also included in the API response for testing)
+        logger.info("OTP request (testing mode) - phone: %s, code: %s", phone, otp)
 
         # Return success without sending actual SMS
         return True
@@ -94,29 +130,27 @@ class OTPService:
         #         "text": f"{otp};{otp}"  # Parameters: code1;code (separated by semicolon)
         #     }
         #
-        #     # Send HTTP POST request
-        #     async with httpx.AsyncClient() as client:
-        #         response = await client.post(
-        #             url,
-        #             json=payload,
-        #             headers={"Content-Type": "application/json"},
-        #             timeout=10.0
-        #         )
+        #     # Send HTTP POST request over the shared client
+        #     response = await sms_client.post(
+        #         url,
+        #         json=payload,
+        #         headers={"Content-Type": "application/json"}
+        #     )
         #
-        #         # Check response
-        #         if response.status_code == 200:
-        #             result = response.json()
-        #             # Faraz SMS returns various status codes
-        #             # Check for successful sending
-        #             if result.get("Value") or result.get("RetStatus") == 1:
-        #                 print(f"✅ OTP sent successfully to {phone} using pattern")
-        #                 return True
-        #             else:
-        #                 print(f"❌ Faraz SMS API error: {result}")
-        #                 return False
+        #     # Check response
+        #     if response.status_code == 200:
+        #         result = response.json()
+        #         # Faraz SMS returns various status codes
+        #         # Check for successful sending
+        #         if result.get("Value") or result.get("RetStatus") == 1:
+        #             print(f"✅ OTP sent successfully to {phone} using pattern")
+        #             return True
         #         else:
-        #             print(f"❌ HTTP Error {response.status_code}: {response.text}")
+        #             print(f"❌ Faraz SMS API error: {result}")
         #             return False
+        #     else:
+        #         print(f"❌ HTTP Error {response.status_code}: {response.text}")
+        #         return False
         #
         # except Exception as e:
         #     print(f"❌ Failed to send OTP via Faraz SMS: {str(e)}")